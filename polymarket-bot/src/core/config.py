@@ -5,6 +5,7 @@ Loads from environment variables and .env file.
 
 from pydantic_settings import BaseSettings
 from pydantic import Field
+from functools import lru_cache
 from typing import Optional
 from pathlib import Path
 
@@ -18,6 +19,7 @@ class Settings(BaseSettings):
     polymarket_chain_id: int = Field(default=137, description="Chain ID (137=Polygon)")
     polymarket_clob_url: str = Field(default="https://clob.polymarket.com")
     polymarket_gamma_url: str = Field(default="https://gamma-api.polymarket.com")
+    polymarket_ws_url: str = Field(default="wss://ws-subscriptions-clob.polymarket.com/ws/market")
     
     # Trading
     paper_trade: bool = Field(default=True, description="Paper trading mode")
@@ -27,7 +29,9 @@ class Settings(BaseSettings):
     
     # Scanning
     scan_interval: int = Field(default=5, description="Scan interval in seconds")
+    rescan_interval: int = Field(default=300, description="Full rescan interval in seconds while the price feed is live")
     min_market_volume: float = Field(default=10000, description="Min market volume USD")
+    price_side: Optional[str] = Field(default=None, description="Book side (BUY/SELL) for REST prices; midpoints if unset")
     
     # Notifications
     telegram_bot_token: Optional[str] = Field(default=None)
@@ -58,12 +62,18 @@ class Settings(BaseSettings):
         return bool(self.polymarket_private_key and self.polymarket_funder)
 
 
-# Global settings instance
-settings = Settings()
-
-
+@lru_cache(maxsize=None)
 def load_settings(env_file: Optional[Path] = None) -> Settings:
-    """Load settings from optional custom env file."""
+    """
+    Load settings from optional custom env file.
+    
+    Cached per env file, so repeat calls skip re-reading .env and
+    re-validating. Use load_settings.cache_clear() to force a reload.
+    """
     if env_file:
         return Settings(_env_file=env_file)
     return Settings()
+
+
+# Global settings instance
+settings = load_settings()
@@ -5,29 +5,29 @@ Core data types for the trading engine.
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional, Dict, Any, List
-from enum import Enum
+from enum import StrEnum
 
 
-class Side(Enum):
+class Side(StrEnum):
     """Order side."""
     BUY = "BUY"
     SELL = "SELL"
 
 
-class Outcome(Enum):
+class Outcome(StrEnum):
     """Market outcome."""
     YES = "YES"
     NO = "NO"
 
 
-class SignalUrgency(Enum):
+class SignalUrgency(StrEnum):
     """Signal urgency level."""
     IMMEDIATE = "immediate"  # Execute now
     NORMAL = "normal"        # Execute within scan cycle
     LOW = "low"              # Can wait
 
 
-class OrderStatus(Enum):
+class OrderStatus(StrEnum):
     """Order execution status."""
     PENDING = "pending"
     FILLED = "filled"
@@ -36,7 +36,7 @@ class OrderStatus(Enum):
     FAILED = "failed"
 
 
-@dataclass
+@dataclass(slots=True)
 class Market:
     """Polymarket market data."""
     id: str
@@ -66,15 +66,19 @@ class Market:
     no_best_bid: Optional[float] = None
     no_best_ask: Optional[float] = None
     
-    @property
-    def spread_sum(self) -> float:
-        """Sum of YES and NO prices. If < 1.0, arbitrage opportunity exists."""
-        return self.yes_price + self.no_price
+    # Derived from prices; kept in sync by set_prices()
+    spread_sum: float = field(init=False)         # YES + NO; < 1.0 means arbitrage
+    arbitrage_spread: float = field(init=False)   # Profit margin buying both sides
     
-    @property
-    def arbitrage_spread(self) -> float:
-        """Arbitrage profit margin if buying both sides."""
-        return 1.0 - self.spread_sum
+    def __post_init__(self):
+        self.set_prices(self.yes_price, self.no_price)
+    
+    def set_prices(self, yes_price: float, no_price: float):
+        """Update prices and the spreads derived from them."""
+        self.yes_price = yes_price
+        self.no_price = no_price
+        self.spread_sum = yes_price + no_price
+        self.arbitrage_spread = 1.0 - self.spread_sum
     
     @property
     def has_arbitrage(self) -> bool:
@@ -82,7 +86,7 @@ class Market:
         return self.spread_sum < 1.0
 
 
-@dataclass
+@dataclass(slots=True)
 class Signal:
     """Trading signal from a strategy module."""
     module: str              # "arbitrage", "news", "latency", etc.
@@ -100,10 +104,37 @@ class Signal:
     metadata: Dict[str, Any] = field(default_factory=dict)
     
     def __str__(self) -> str:
-        return f"Signal({self.module}: {self.action.value} {self.outcome.value} @ {self.market_id[:8]}... EV=${self.expected_value:.2f})"
+        return f"Signal({self.module}: {self.action} {self.outcome} @ {self.market_id[:8]}... EV=${self.expected_value:.2f})"
+
+
+@dataclass(slots=True)
+class PairedArbSignal:
+    """Arbitrage signal: buy YES and NO of one market together."""
+    module: str              # "arbitrage"
+    market_id: str           # Polymarket market ID
+    yes_token_id: str
+    no_token_id: str
+    yes_price: float
+    no_price: float
+    shares: float            # Shares to buy on each side
+    expected_value: float    # Guaranteed profit in USD
+    
+    confidence: float = 1.0  # Arbitrage is mathematically certain
+    urgency: SignalUrgency = SignalUrgency.IMMEDIATE
+    
+    timestamp: datetime = field(default_factory=datetime.utcnow)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    
+    @property
+    def total_cost(self) -> float:
+        """Cost of one YES + NO share pair."""
+        return self.yes_price + self.no_price
+    
+    def __str__(self) -> str:
+        return f"PairedArbSignal({self.module}: BUY YES+NO @ {self.market_id[:8]}... EV=${self.expected_value:.2f})"
 
 
-@dataclass
+@dataclass(slots=True)
 class ArbitrageOpportunity:
     """Detected arbitrage opportunity."""
     market: Market
@@ -124,7 +155,7 @@ class ArbitrageOpportunity:
         return f"Arb({self.market.question[:30]}... | Cost: ${self.total_cost:.4f} | Profit: {self.profit_pct:.2%})"
 
 
-@dataclass 
+@dataclass(slots=True)
 class Order:
     """Order to be executed."""
     market_id: str
@@ -145,6 +176,7 @@ class Order:
     
     created_at: datetime = field(default_factory=datetime.utcnow)
     executed_at: Optional[datetime] = None
+    expiration: Optional[datetime] = None  # Not fillable after this time
     
     @property
     def is_filled(self) -> bool:
@@ -157,7 +189,7 @@ class Order:
         return self.filled_size / self.size
 
 
-@dataclass
+@dataclass(slots=True)
 class Trade:
     """Executed trade record."""
     id: str
@@ -179,7 +211,7 @@ class Trade:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class Position:
     """Current position in a market."""
     market_id: str
@@ -5,7 +5,10 @@ Uses both Gamma API (metadata) and CLOB API (trading).
 
 import asyncio
 import aiohttp
-from typing import List, Optional, Dict, Any
+import msgspec
+import numpy as np
+import orjson
+from typing import List, Optional, Dict, Any, AsyncIterator, Iterable, Set, Tuple, Callable, Union
 from datetime import datetime
 from loguru import logger
 
@@ -13,6 +16,96 @@ from src.core.config import settings
 from src.core.types import Market
 
 
+class RawToken(msgspec.Struct):
+    """Outcome token as returned inside a market payload."""
+    token_id: str = ""
+    outcome: str = ""
+    price: Optional[float] = None
+
+
+class RawMarket(msgspec.Struct):
+    """
+    Market payload as returned by the markets endpoint.
+    
+    Decoded straight from the response body (lax mode, so numeric
+    strings become floats); unknown fields are ignored. Gamma uses
+    camelCase keys and JSON-encoded token lists; those land in the
+    gamma_* fields and are folded into the snake_case ones by
+    _normalize_gamma().
+    """
+    condition_id: Optional[str] = ""
+    id: Optional[Union[str, int]] = None
+    question: Optional[str] = ""
+    slug: Optional[str] = ""
+    tokens: List[RawToken] = []
+    volume_24hr: Optional[float] = None
+    liquidity: Optional[float] = None
+    end_date_iso: Optional[str] = None
+    category: Optional[str] = None
+    active: Optional[bool] = True
+    updated_at: Optional[str] = None
+    
+    # Gamma-native fields
+    gamma_condition_id: Optional[str] = msgspec.field(default="", name="conditionId")
+    gamma_volume_24hr: Optional[float] = msgspec.field(default=None, name="volume24hr")
+    gamma_end_date_iso: Optional[str] = msgspec.field(default=None, name="endDateIso")
+    gamma_updated_at: Optional[str] = msgspec.field(default=None, name="updatedAt")
+    gamma_token_ids: Optional[str] = msgspec.field(default=None, name="clobTokenIds")
+    gamma_outcomes: Optional[str] = msgspec.field(default=None, name="outcomes")
+    gamma_outcome_prices: Optional[str] = msgspec.field(default=None, name="outcomePrices")
+
+
+_decode_market = msgspec.json.Decoder(RawMarket, strict=False).decode
+
+
+def _decode_markets(records: List[msgspec.Raw]) -> List[RawMarket]:
+    """
+    Decode and normalize market records one at a time.
+    
+    A record that doesn't fit RawMarket, or whose Gamma token fields
+    don't parse, is skipped on its own rather than failing the whole
+    page it came in.
+    """
+    markets = []
+    for record in records:
+        try:
+            markets.append(_normalize_gamma(_decode_market(record)))
+        except (msgspec.ValidationError, ValueError, TypeError) as e:
+            logger.debug(f"Skipping malformed market: {e}")
+    return markets
+
+
+def _normalize_gamma(raw: RawMarket) -> RawMarket:
+    """
+    Fill the snake_case fields of a Gamma payload from its native fields.
+    
+    Raises ValueError/TypeError if the JSON-encoded token fields are
+    present but malformed.
+    """
+    raw.condition_id = raw.condition_id or raw.gamma_condition_id or ""
+    if raw.volume_24hr is None:
+        raw.volume_24hr = raw.gamma_volume_24hr
+    raw.end_date_iso = raw.end_date_iso or raw.gamma_end_date_iso
+    raw.updated_at = raw.updated_at or raw.gamma_updated_at
+    
+    if not raw.tokens and raw.gamma_token_ids and raw.gamma_outcomes:
+        token_ids = orjson.loads(raw.gamma_token_ids)
+        outcomes = orjson.loads(raw.gamma_outcomes)
+        prices = orjson.loads(raw.gamma_outcome_prices or "[]")
+        if not all(isinstance(v, list) for v in (token_ids, outcomes, prices)):
+            raise TypeError("Gamma token fields are not JSON lists")
+        prices = prices + [None] * (len(token_ids) - len(prices))
+        raw.tokens = [
+            RawToken(
+                token_id=str(token_id),
+                outcome=str(outcome),
+                price=float(price) if price not in (None, "") else None
+            )
+            for token_id, outcome, price in zip(token_ids, outcomes, prices)
+        ]
+    return raw
+
+
 class PolymarketClient:
     """
     Client for interacting with Polymarket APIs.
@@ -21,15 +114,33 @@ class PolymarketClient:
     - CLOB API: Orderbooks, trades, order execution
     """
     
+    PAGE_SIZE = 500         # Markets per Gamma page
+    PAGE_CONCURRENCY = 8    # Pages fetched in parallel after the first
+    PAGE_RETRIES = 3        # Attempts per page (429/5xx), backing off 1s, 2s
+    
     def __init__(self):
         self.gamma_url = settings.polymarket_gamma_url
         self.clob_url = settings.polymarket_clob_url
         self._session: Optional[aiohttp.ClientSession] = None
     
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create aiohttp session."""
+        """
+        Get or create aiohttp session.
+        
+        The session is long-lived and pools keep-alive connections, so
+        concurrent price requests reuse warm TCP/TLS connections instead
+        of paying a handshake each.
+        """
         if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=128,
+                limit_per_host=64,
+                keepalive_timeout=75,
+                ttl_dns_cache=600,
+                enable_cleanup_closed=True
+            )
             self._session = aiohttp.ClientSession(
+                connector=connector,
                 timeout=aiohttp.ClientTimeout(total=30)
             )
         return self._session
@@ -39,13 +150,39 @@ class PolymarketClient:
         if self._session and not self._session.closed:
             await self._session.close()
     
-    async def _get(self, url: str, params: Optional[Dict] = None) -> Any:
-        """Make GET request with error handling."""
+    async def _get(self, url: str, params: Optional[Dict] = None, schema: Any = None) -> Any:
+        """
+        Make GET request with error handling.
+        
+        If schema is given, the body is decoded directly into that type
+        with msgspec; otherwise into plain dicts/lists.
+        """
         session = await self._get_session()
         try:
             async with session.get(url, params=params) as resp:
                 if resp.status == 200:
-                    return await resp.json()
+                    body = await resp.read()
+                    if schema is not None:
+                        return msgspec.json.decode(body, type=schema, strict=False)
+                    return orjson.loads(body)
+                else:
+                    logger.error(f"API error {resp.status}: {url}")
+                    return None
+        except Exception as e:
+            logger.error(f"Request failed: {url} - {e}")
+            return None
+    
+    async def _post(self, url: str, payload: Any) -> Any:
+        """Make POST request with JSON body and error handling."""
+        session = await self._get_session()
+        try:
+            async with session.post(
+                url,
+                data=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"}
+            ) as resp:
+                if resp.status == 200:
+                    return orjson.loads(await resp.read())
                 else:
                     logger.error(f"API error {resp.status}: {url}")
                     return None
@@ -61,12 +198,36 @@ class PolymarketClient:
         self,
         active: bool = True,
         limit: int = 100,
-        offset: int = 0
-    ) -> List[Dict]:
+        offset: int = 0,
+        min_volume: float = 0
+    ) -> Optional[List[RawMarket]]:
         """
         Fetch markets from Gamma API.
         
-        Returns raw market data from API.
+        Filtering happens server-side: closed markets are excluded, and
+        with min_volume only markets whose total volume reaches it are
+        returned (a superset of those reaching it in 24h).
+        
+        Returns raw market data from API, or None if the request failed
+        (as opposed to [] past the end of the list).
+        """
+        page = await self._get_market_page(active, limit, offset, min_volume)
+        return page[0] if page is not None else None
+    
+    async def _get_market_page(
+        self,
+        active: bool,
+        limit: int,
+        offset: int,
+        min_volume: float
+    ) -> Optional[Tuple[List[RawMarket], int]]:
+        """
+        Fetch one Gamma page as (markets, records on the page).
+        
+        The record count includes malformed records that were skipped,
+        so callers can tell a short page from a cleaned-up full one.
+        Failed requests are retried PAGE_RETRIES times with backoff;
+        None if every attempt failed.
         """
         params = {
             "limit": limit,
@@ -74,38 +235,61 @@ class PolymarketClient:
             "active": str(active).lower(),
             "closed": "false"
         }
+        if min_volume > 0:
+            params["volume_num_min"] = min_volume
         
         url = f"{self.gamma_url}/markets"
-        data = await self._get(url, params)
-        
-        if data is None:
-            return []
+        for attempt in range(self.PAGE_RETRIES):
+            if attempt:
+                await asyncio.sleep(2 ** (attempt - 1))
+            data = await self._get(url, params, schema=List[msgspec.Raw])
+            if data is not None:
+                return _decode_markets(data), len(data)
         
-        return data if isinstance(data, list) else []
+        logger.error(f"Market page at offset {offset} failed after {self.PAGE_RETRIES} attempts")
+        return None
     
-    async def get_all_active_markets(self) -> List[Dict]:
-        """Fetch all active markets (paginated)."""
-        all_markets = []
-        offset = 0
-        limit = 100
+    async def get_all_active_markets(self, min_volume: float = 0) -> Optional[List[RawMarket]]:
+        """
+        Fetch all active markets (paginated).
         
-        while True:
-            markets = await self.get_markets(active=True, limit=limit, offset=offset)
-            if not markets:
-                break
-            all_markets.extend(markets)
-            if len(markets) < limit:
-                break
-            offset += limit
-            await asyncio.sleep(0.1)  # Rate limiting
+        The first page is fetched alone; if it is full, following pages
+        are fetched PAGE_CONCURRENCY at a time until a short page appears.
+        Returns None if any page still fails after retries, rather than
+        a silently truncated list.
+        """
+        limit = self.PAGE_SIZE
+        first = await self._get_market_page(True, limit, 0, min_volume)
+        if first is None:
+            return None
+        all_markets, count = first
+        offset = limit
+        last_full = count == limit
+        
+        while last_full:
+            offsets = range(offset, offset + limit * self.PAGE_CONCURRENCY, limit)
+            pages = await asyncio.gather(
+                *(self._get_market_page(True, limit, o, min_volume) for o in offsets)
+            )
+            for page in pages:
+                if page is None:
+                    return None
+                markets, count = page
+                all_markets.extend(markets)
+                last_full = count == limit
+                if not last_full:
+                    break
+            offset += limit * self.PAGE_CONCURRENCY
         
         logger.info(f"Fetched {len(all_markets)} active markets")
         return all_markets
     
-    async def get_market_by_id(self, market_id: str) -> Optional[Dict]:
+    async def get_market_by_id(self, market_id: str) -> Optional[RawMarket]:
         """Fetch single market by ID."""
         url = f"{self.gamma_url}/markets/{market_id}"
-        return await self._get(url)
+        record = await self._get(url, schema=msgspec.Raw)
+        markets = _decode_markets([record]) if record else []
+        return markets[0] if markets else None
     
     # =========================================
     # CLOB API - Orderbooks & Prices
@@ -166,6 +350,48 @@ class PolymarketClient:
             "no": no_price or 0.0
         }
     
+    async def get_midpoints_bulk(self, token_ids: List[str]) -> Dict[str, float]:
+        """
+        Get midpoint prices for many tokens in one request.
+        
+        Returns:
+            {token_id: midpoint} for every token the CLOB priced
+        """
+        url = f"{self.clob_url}/midpoints"
+        data = await self._post(url, [{"token_id": t} for t in token_ids])
+        
+        if not isinstance(data, dict):
+            return {}
+        
+        midpoints = {}
+        for token_id, mid in data.items():
+            try:
+                midpoints[token_id] = float(mid)
+            except (ValueError, TypeError):
+                continue
+        return midpoints
+    
+    async def get_prices_bulk(self, token_ids: List[str], side: str = "BUY") -> Dict[str, float]:
+        """
+        Get book prices on one side for many tokens in one request.
+        
+        Returns:
+            {token_id: price} for every token the CLOB priced
+        """
+        url = f"{self.clob_url}/prices"
+        data = await self._post(url, [{"token_id": t, "side": side} for t in token_ids])
+        
+        if not isinstance(data, dict):
+            return {}
+        
+        prices = {}
+        for token_id, sides in data.items():
+            try:
+                prices[token_id] = float(sides[side])
+            except (KeyError, ValueError, TypeError):
+                continue
+        return prices
+    
     async def get_last_trade_price(self, token_id: str) -> Optional[float]:
         """Get last trade price for a token."""
         url = f"{self.clob_url}/last-trade-price"
@@ -183,7 +409,7 @@ class PolymarketClient:
     # Helper: Parse to Market objects
     # =========================================
     
-    def parse_market(self, raw: Dict, prices: Optional[Dict] = None) -> Optional[Market]:
+    def parse_market(self, raw: RawMarket, prices: Optional[Dict] = None) -> Optional[Market]:
         """
         Parse raw API response to Market object.
         
@@ -191,68 +417,345 @@ class PolymarketClient:
             raw: Raw market data from Gamma API
             prices: Optional price data {"yes": 0.45, "no": 0.55}
         """
-        try:
-            # Extract token IDs from outcomes
-            tokens = raw.get("tokens", [])
-            if len(tokens) < 2:
-                return None
-            
-            yes_token = None
-            no_token = None
-            
-            for token in tokens:
-                outcome = token.get("outcome", "").upper()
-                if outcome == "YES":
-                    yes_token = token.get("token_id")
-                elif outcome == "NO":
-                    no_token = token.get("token_id")
-            
-            if not yes_token or not no_token:
-                return None
-            
-            # Get prices from tokens if not provided
-            yes_price = 0.0
-            no_price = 0.0
+        tokens = raw.tokens
+        if len(tokens) < 2:
+            return None
+        
+        # Binary markets almost always list [Yes, No]; take them directly
+        if len(tokens) == 2 and tokens[0].outcome == "Yes" and tokens[1].outcome == "No":
+            yes, no = tokens
+        else:
+            # Otherwise index tokens by outcome in a single pass
+            by_outcome = {t.outcome.upper(): t for t in tokens}
+            yes, no = by_outcome.get("YES"), by_outcome.get("NO")
+        if not yes or not no or not yes.token_id or not no.token_id:
+            return None
+        
+        # Get prices from tokens if not provided
+        if prices:
+            yes_price = prices.get("yes", 0.0)
+            no_price = prices.get("no", 0.0)
+        else:
+            yes_price = yes.price or 0.0
+            no_price = no.price or 0.0
+        
+        # Parse end date
+        end_date = None
+        if raw.end_date_iso:
+            try:
+                end_date = datetime.fromisoformat(
+                    raw.end_date_iso.replace("Z", "+00:00")
+                )
+            except ValueError:
+                pass
+        
+        return Market(
+            id=raw.condition_id or str(raw.id or ""),
+            question=raw.question or "",
+            slug=raw.slug or "",
+            yes_token_id=yes.token_id,
+            no_token_id=no.token_id,
+            yes_price=yes_price,
+            no_price=no_price,
+            volume_24h=raw.volume_24hr or 0.0,
+            liquidity=raw.liquidity or 0.0,
+            end_date=end_date,
+            category=raw.category,
+            is_active=raw.active is not False
+        )
+
+
+class PriceFeed:
+    """
+    Live price feed over the CLOB market WebSocket channel.
+    
+    Keeps an in-memory token_id -> price cache that is updated as the
+    server pushes book / price_change / last_trade_price events, so
+    scans can read prices without any per-market REST calls.
+    """
+    
+    PING_INTERVAL = 10     # Seconds between PING frames
+    STALE_TIMEOUT = 30     # Reconnect if nothing received for this long
+    RECONNECT_DELAY = 1    # Initial backoff, doubled up to STALE_TIMEOUT
+    
+    def __init__(self, ws_url: Optional[str] = None):
+        self.ws_url = ws_url or settings.polymarket_ws_url
+        self._prices: Dict[str, float] = {}
+        self._assets: Set[str] = set()
+        self._listeners: List[Callable[[str, float], None]] = []
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self._healthy = False  # Handled an event on the current connection
+    
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None and not self._ws.closed
+    
+    def get_price(self, token_id: str) -> Optional[float]:
+        """
+        Latest pushed price for a token.
+        
+        None if not seen yet, or while the feed is disconnected: prices
+        it pushed before a drop may be stale by now.
+        """
+        if not self.connected:
+            return None
+        return self._prices.get(token_id)
+    
+    def add_listener(self, callback: Callable[[str, float], None]):
+        """Call callback(token_id, price) on every pushed price update."""
+        self._listeners.append(callback)
+    
+    async def subscribe(self, token_ids: Iterable[str]):
+        """
+        Subscribe to price updates for the given tokens.
+        
+        Starts the feed on first use. Tokens already subscribed are skipped.
+        """
+        new_ids = [t for t in token_ids if t and t not in self._assets]
+        if not new_ids:
+            return
+        self._assets.update(new_ids)
+        
+        if self._task is None or self._task.done():
+            self._running = True
+            self._task = asyncio.create_task(self._run())
+        elif self.connected:
+            await self._ws.send_str(orjson.dumps({
+                "assets_ids": new_ids,
+                "operation": "subscribe"
+            }).decode())
+    
+    async def close(self):
+        """Stop the feed and close the socket."""
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._ws and not self._ws.closed:
+            await self._ws.close()
+        if self._session and not self._session.closed:
+            await self._session.close()
+    
+    async def _run(self):
+        """Connect, stream and reconnect until closed."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        
+        delay = self.RECONNECT_DELAY
+        while self._running:
+            try:
+                self._healthy = False
+                async with self._session.ws_connect(self.ws_url) as ws:
+                    self._ws = ws
+                    await ws.send_str(orjson.dumps({
+                        "assets_ids": list(self._assets),
+                        "type": "market"
+                    }).decode())
+                    logger.info(f"Price feed connected ({len(self._assets)} assets)")
+                    
+                    pinger = asyncio.create_task(self._ping(ws))
+                    try:
+                        await self._read(ws)
+                    finally:
+                        pinger.cancel()
+                        # Retrieve its error (e.g. sending on a closed socket)
+                        await asyncio.gather(pinger, return_exceptions=True)
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                logger.warning(f"Price feed silent for {self.STALE_TIMEOUT}s, reconnecting")
+            except Exception as e:
+                logger.warning(f"Price feed error: {e}")
+            finally:
+                self._ws = None
+                # Whatever was pushed before the drop can't be trusted once
+                # updates stop; the next connection re-sends book snapshots
+                self._prices.clear()
             
-            if prices:
-                yes_price = prices.get("yes", 0.0)
-                no_price = prices.get("no", 0.0)
-            else:
-                for token in tokens:
-                    outcome = token.get("outcome", "").upper()
-                    price = float(token.get("price", 0) or 0)
-                    if outcome == "YES":
-                        yes_price = price
-                    elif outcome == "NO":
-                        no_price = price
+            if self._running:
+                # Only back off from scratch once a connection actually
+                # delivered data, so a failing connect can't loop every second
+                if self._healthy:
+                    delay = self.RECONNECT_DELAY
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.STALE_TIMEOUT)
+    
+    async def _ping(self, ws: aiohttp.ClientWebSocketResponse):
+        """Keep the connection alive."""
+        while not ws.closed:
+            await asyncio.sleep(self.PING_INTERVAL)
+            await ws.send_str("PING")
+    
+    async def _read(self, ws: aiohttp.ClientWebSocketResponse):
+        """
+        Read messages until the socket closes.
+        
+        Raises asyncio.TimeoutError when no message (including PONG)
+        arrives within STALE_TIMEOUT, which catches silently dead sockets.
+        """
+        while True:
+            msg = await ws.receive(timeout=self.STALE_TIMEOUT)
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                if msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    return
+                continue
+            if msg.data == "PONG":
+                continue
+            try:
+                payload = orjson.loads(msg.data)
+            except ValueError:
+                continue
             
-            # Parse end date
-            end_date = None
-            if raw.get("end_date_iso"):
+            events = payload if isinstance(payload, list) else [payload]
+            for event in events:
+                if not isinstance(event, dict):
+                    continue
                 try:
-                    end_date = datetime.fromisoformat(
-                        raw["end_date_iso"].replace("Z", "+00:00")
-                    )
-                except:
-                    pass
-            
-            return Market(
-                id=raw.get("condition_id", raw.get("id", "")),
-                question=raw.get("question", ""),
-                slug=raw.get("slug", ""),
-                yes_token_id=yes_token,
-                no_token_id=no_token,
-                yes_price=yes_price,
-                no_price=no_price,
-                volume_24h=float(raw.get("volume_24hr", 0) or 0),
-                liquidity=float(raw.get("liquidity", 0) or 0),
-                end_date=end_date,
-                category=raw.get("category"),
-                is_active=raw.get("active", True)
-            )
-        except Exception as e:
-            logger.debug(f"Failed to parse market: {e}")
+                    self._handle_event(event)
+                except (KeyError, ValueError, TypeError, AttributeError) as e:
+                    logger.debug(f"Skipping malformed {event.get('event_type')} event: {e!r}")
+                    continue
+                self._healthy = True
+    
+    def _handle_event(self, event: Dict):
+        """Update the price cache from a single market channel event."""
+        event_type = event.get("event_type")
+        
+        if event_type == "book":
+            bids = event.get("bids") or []
+            asks = event.get("asks") or []
+            if bids and asks:
+                best_bid = max(float(b["price"]) for b in bids)
+                best_ask = min(float(a["price"]) for a in asks)
+                self._set_mid(event.get("asset_id"), best_bid, best_ask)
+        
+        elif event_type == "price_change":
+            for change in event.get("price_changes") or [event]:
+                asset_id = change.get("asset_id", event.get("asset_id"))
+                # "price" here is the book level whose size changed, not
+                # the market price; only the top of book moves the mid
+                if change.get("best_bid") and change.get("best_ask"):
+                    self._set_mid(asset_id, float(change["best_bid"]), float(change["best_ask"]))
+        
+        elif event_type == "last_trade_price":
+            if event.get("price"):
+                self._set_price(event.get("asset_id"), float(event["price"]))
+    
+    def _set_mid(self, asset_id: Optional[str], best_bid: float, best_ask: float):
+        self._set_price(asset_id, (best_bid + best_ask) / 2)
+    
+    def _set_price(self, asset_id: Optional[str], price: float):
+        if asset_id:
+            self._prices[asset_id] = price
+            for callback in self._listeners:
+                try:
+                    callback(asset_id, price)
+                except Exception as e:
+                    logger.error(f"Price listener failed for {asset_id}: {e}")
+
+
+class PriceBook:
+    """
+    Structure-of-arrays price store for the scanned markets.
+    
+    One row per market, with columns yes/no/volume/liquidity. Pushed
+    prices are written in place by token ID, and the rows they touch
+    are flagged in `dirty`, so detection can run straight on the arrays
+    instead of walking Market objects. load() rebuilds the book from a
+    full scan, which also drops markets that are no longer listed.
+    """
+    
+    def __init__(self):
+        self.markets: List[Market] = []
+        self.yes = np.empty(0, dtype=np.float64)
+        self.no = np.empty(0, dtype=np.float64)
+        self.volume = np.empty(0, dtype=np.float64)
+        self.liquidity = np.empty(0, dtype=np.float64)
+        self.dirty = np.zeros(0, dtype=bool)
+        
+        # token_id -> (row, is_yes)
+        self._index: Dict[str, Tuple[int, bool]] = {}
+    
+    def __len__(self) -> int:
+        return len(self.markets)
+    
+    def load(self, markets: List[Market]):
+        """
+        Rebuild the columns and token index from a list of markets.
+        
+        Rows still flagged dirty stay dirty in the new book (matched by
+        token), so ticks that landed during a rescan aren't lost.
+        """
+        old_markets = self.markets
+        pending = [old_markets[i].yes_token_id for i in np.flatnonzero(self.dirty).tolist()]
+        
+        n = len(markets)
+        self.markets = markets
+        self.yes = np.fromiter((m.yes_price for m in markets), dtype=np.float64, count=n)
+        self.no = np.fromiter((m.no_price for m in markets), dtype=np.float64, count=n)
+        self.volume = np.fromiter((m.volume_24h for m in markets), dtype=np.float64, count=n)
+        self.liquidity = np.fromiter((m.liquidity for m in markets), dtype=np.float64, count=n)
+        self.dirty = np.zeros(n, dtype=bool)
+        
+        index = {}
+        for row, m in enumerate(markets):
+            index[m.yes_token_id] = (row, True)
+            index[m.no_token_id] = (row, False)
+        self._index = index
+        
+        for token_id in pending:
+            entry = index.get(token_id)
+            if entry is not None:
+                self.dirty[entry[0]] = True
+    
+    def update(self, token_id: str, price: float) -> Optional[Tuple[int, bool]]:
+        """
+        Write a token's price in place.
+        
+        Returns (row, is_yes) for the token, or None if it isn't in the book.
+        """
+        entry = self._index.get(token_id)
+        if entry is None:
             return None
+        
+        row, is_yes = entry
+        (self.yes if is_yes else self.no)[row] = price
+        self.dirty[row] = True
+        return entry
+    
+    def take_dirty(self) -> np.ndarray:
+        """Rows updated since the last call, clearing their flags."""
+        rows = np.flatnonzero(self.dirty)
+        self.dirty[rows] = False
+        return rows
+    
+    def snapshot(
+        self,
+        rows: Optional[np.ndarray] = None
+    ) -> Tuple[List[Market], np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Copy out (markets, yes, no, volume, liquidity) for rows (all if None).
+        
+        The copies are safe to hand to another thread while the feed
+        keeps writing to the book.
+        """
+        if rows is None:
+            return (
+                list(self.markets), self.yes.copy(), self.no.copy(),
+                self.volume.copy(), self.liquidity.copy()
+            )
+        markets = self.markets
+        return (
+            [markets[i] for i in rows.tolist()], self.yes[rows], self.no[rows],
+            self.volume[rows], self.liquidity[rows]
+        )
 
 
 class MarketScanner:
@@ -260,15 +763,52 @@ class MarketScanner:
     Scans all active markets and enriches with real-time prices.
     """
     
-    def __init__(self, client: PolymarketClient):
+    MAX_CONCURRENT_REQUESTS = 32  # In-flight price requests per scan
+    PRICE_BATCH_SIZE = 500        # Token IDs per bulk price request
+    
+    def __init__(
+        self,
+        client: PolymarketClient,
+        feed: Optional[PriceFeed] = None,
+        price_side: Optional[str] = None
+    ):
+        """
+        Args:
+            client: Polymarket API client
+            feed: Optional live price feed, read before falling back to REST
+            price_side: Price REST fallbacks at this book side ("BUY"/"SELL")
+                via /prices instead of /midpoints
+        """
         self.client = client
+        self.feed = feed
+        self.price_side = price_side
         self._market_cache: Dict[str, Market] = {}
         self._last_scan: Optional[datetime] = None
+        
+        # condition_id -> (updated_at, Market) from the previous scan
+        self._parse_cache: Dict[str, Tuple[str, Market]] = {}
+        
+        # Structure-of-arrays view of the last scan, kept current by the feed
+        self.book = PriceBook()
+        self._listeners: List[Callable[[Market], None]] = []
+        
+        if feed is not None:
+            feed.add_listener(self._on_price)
+    
+    def add_listener(self, callback: Callable[[Market], None]):
+        """Call callback(market) whenever a pushed price changes a scanned market."""
+        self._listeners.append(callback)
+    
+    @property
+    def markets(self) -> List[Market]:
+        """Markets from the most recent completed scan."""
+        return self.book.markets
     
     async def scan_all_markets(
         self,
         min_volume: float = 0,
-        fetch_prices: bool = True
+        fetch_prices: bool = True,
+        use_feed: bool = True
     ) -> List[Market]:
         """
         Scan all active markets and return Market objects.
@@ -276,38 +816,157 @@ class MarketScanner:
         Args:
             min_volume: Minimum 24h volume filter
             fetch_prices: Whether to fetch real-time prices (slower but accurate)
+            use_feed: Take prices the live feed already has rather than
+                re-checking every market over REST
+        """
+        async for _ in self.iter_market_batches(min_volume, fetch_prices, use_feed):
+            pass
+        return self.book.markets
+    
+    async def iter_market_batches(
+        self,
+        min_volume: float = 0,
+        fetch_prices: bool = True,
+        use_feed: bool = True
+    ) -> AsyncIterator[List[Market]]:
+        """
+        Scan all active markets, yielding them in batches as prices arrive.
+        
+        Markets the price feed has already priced come first; REST-priced
+        batches follow in completion order, so a consumer can work on one
+        batch while later ones are still in flight. Once exhausted, the
+        scan is indexed exactly as by scan_all_markets(). If the market
+        list can't be fetched in full, nothing is yielded and the last
+        scan is kept.
+        
+        Args:
+            min_volume: Minimum 24h volume filter
+            fetch_prices: Whether to fetch real-time prices (slower but accurate)
+            use_feed: Take prices the live feed already has rather than
+                re-checking every market over REST
+        """
+        markets = await self._load_markets(min_volume)
+        if markets is None:
+            # Keep the last scan (and the live book) rather than replace
+            # it with a truncated universe
+            logger.warning("Market list incomplete, skipping this scan")
+            return
+        
+        if not fetch_prices:
+            if markets:
+                yield markets
+        else:
+            if self.feed is not None:
+                await self.feed.subscribe(
+                    t for m in markets for t in (m.yes_token_id, m.no_token_id)
+                )
+            
+            priced, missing = [], []
+            for market in markets:
+                yes_price = no_price = None
+                if use_feed and self.feed is not None:
+                    yes_price = self.feed.get_price(market.yes_token_id)
+                    no_price = self.feed.get_price(market.no_token_id)
+                
+                if yes_price is None or no_price is None:
+                    missing.append(market)
+                else:
+                    market.set_prices(yes_price, no_price)
+                    priced.append(market)
+            
+            if priced:
+                yield priced
+            
+            # Fall back to REST until the feed has pushed both sides
+            size = self.PRICE_BATCH_SIZE // 2  # Two tokens per market
+            sem = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+            
+            async def fetch(batch: List[Market]) -> List[Market]:
+                async with sem:
+                    await self._fetch_rest_prices(batch)
+                return batch
+            
+            tasks = [
+                asyncio.create_task(fetch(missing[i:i + size]))
+                for i in range(0, len(missing), size)
+            ]
+            try:
+                for next_batch in asyncio.as_completed(tasks):
+                    yield await next_batch
+            finally:
+                for task in tasks:
+                    task.cancel()
+        
+        # Index in fetch order so results don't depend on batch timing
+        self.book.load(markets)
+        self._last_scan = datetime.utcnow()
+        logger.info(f"Scanned {len(markets)} markets (min_volume: ${min_volume})")
+    
+    async def _load_markets(self, min_volume: float) -> Optional[List[Market]]:
         """
-        raw_markets = await self.client.get_all_active_markets()
+        Fetch and parse all active markets above min_volume (no prices).
+        
+        None if the market list couldn't be fetched in full.
+        """
+        raw_markets = await self.client.get_all_active_markets(min_volume=min_volume)
+        if raw_markets is None:
+            return None
         markets = []
+        parse_cache = {}
         
         for raw in raw_markets:
             # Apply volume filter early
-            volume = float(raw.get("volume_24hr", 0) or 0)
+            volume = raw.volume_24hr or 0.0
             if volume < min_volume:
                 continue
             
-            market = self.client.parse_market(raw)
-            if not market:
-                continue
-            
-            # Optionally fetch real-time prices
-            if fetch_prices and market.yes_token_id and market.no_token_id:
-                prices = await self.client.get_prices_for_market(
-                    market.yes_token_id,
-                    market.no_token_id
+            # Reuse last scan's Market if the payload hasn't been updated.
+            # updatedAt doesn't track prices or the volume/liquidity
+            # counters, so those are refreshed from this payload either way
+            key, updated_at = raw.condition_id, raw.updated_at
+            cached = self._parse_cache.get(key) if key and updated_at else None
+            if cached and cached[0] == updated_at:
+                market = cached[1]
+                market.volume_24h = volume
+                market.liquidity = raw.liquidity or 0.0
+                prices = {t.token_id: t.price for t in raw.tokens}
+                market.set_prices(
+                    prices.get(market.yes_token_id) or 0.0,
+                    prices.get(market.no_token_id) or 0.0
                 )
-                market.yes_price = prices["yes"]
-                market.no_price = prices["no"]
-                await asyncio.sleep(0.05)  # Rate limiting
+            else:
+                market = self.client.parse_market(raw)
+                if not market:
+                    continue
+            
+            if key and updated_at:
+                parse_cache[key] = (updated_at, market)
             
             markets.append(market)
             self._market_cache[market.id] = market
         
-        self._last_scan = datetime.utcnow()
-        logger.info(f"Scanned {len(markets)} markets (min_volume: ${min_volume})")
-        
+        # Only keep markets seen this scan, so the cache can't grow unbounded
+        self._parse_cache = parse_cache
         return markets
     
+    async def _fetch_rest_prices(self, markets: List[Market]):
+        """Price one batch of markets with a single bulk request."""
+        token_ids = [t for m in markets for t in (m.yes_token_id, m.no_token_id)]
+        try:
+            if self.price_side:
+                prices = await self.client.get_prices_bulk(token_ids, self.price_side)
+            else:
+                prices = await self.client.get_midpoints_bulk(token_ids)
+        except Exception as e:
+            logger.debug(f"Price batch failed: {e}")
+            prices = {}
+        
+        for market in markets:
+            market.set_prices(
+                prices.get(market.yes_token_id, 0.0),
+                prices.get(market.no_token_id, 0.0)
+            )
+    
     async def get_market(self, market_id: str) -> Optional[Market]:
         """Get market from cache or fetch."""
         if market_id in self._market_cache:
@@ -321,31 +980,73 @@ class MarketScanner:
                 return market
         return None
     
+    def _on_price(self, token_id: str, price: float):
+        """Apply a pushed price to its book row and market."""
+        book = self.book
+        entry = book.update(token_id, price)
+        if entry is None:
+            return
+        
+        # Only the ticked side: during a rescan the Market may already
+        # hold a newer REST price for the other leg than this book has
+        row, is_yes = entry
+        market = book.markets[row]
+        if is_yes:
+            market.set_prices(price, market.no_price)
+        else:
+            market.set_prices(market.yes_price, price)
+        
+        for callback in self._listeners:
+            callback(market)
+    
     def find_arbitrage_opportunities(
         self,
         markets: List[Market],
-        min_spread: float = 0.01
+        min_spread: float = 0.01,
+        min_volume: float = None,
+        top_k: Optional[int] = 50
     ) -> List[Market]:
         """
         Find markets where YES + NO < 1.0 (arbitrage opportunity).
         
+        Works on the price book built by the last scan (or a temporary
+        one for any other list), so the whole universe is filtered in
+        one vectorized pass. Only the top_k widest spreads are sorted
+        and returned.
+        
         Args:
             markets: List of markets to scan
             min_spread: Minimum spread (1.0 - sum) to consider
+            min_volume: Minimum 24h volume (default from settings)
+            top_k: Maximum number of markets to return (None for all)
         """
-        opportunities = []
+        # Other lists get their own book; self.book is the live one the feed
+        # writes to, and is only reloaded by a full scan
+        book = self.book
+        if markets is not book.markets:
+            book = PriceBook()
+            book.load(markets)
+        if min_volume is None:
+            min_volume = settings.min_market_volume
         
-        for market in markets:
-            if market.yes_price <= 0 or market.no_price <= 0:
-                continue
-            
-            spread = market.arbitrage_spread
-            if spread >= min_spread:
-                opportunities.append(market)
-                logger.info(
-                    f"🎯 Arbitrage found: {market.question[:50]}... "
-                    f"| YES: {market.yes_price:.3f} NO: {market.no_price:.3f} "
-                    f"| Spread: {spread:.2%}"
-                )
+        yes, no = book.yes, book.no
+        spread = 1.0 - yes - no
+        idx = np.nonzero(
+            (yes > 0) & (no > 0) & (spread >= min_spread) & (book.volume >= min_volume)
+        )[0]
+        
+        # Partition out the top_k before sorting: O(N + K log K)
+        if top_k is not None and idx.size > top_k:
+            idx = idx[np.argpartition(-spread[idx], top_k - 1)[:top_k]]
+        order = idx[np.argsort(-spread[idx], kind="stable")]
+        
+        opportunities = [book.markets[i] for i in order]
+        log = logger.opt(lazy=True)
+        for market in opportunities:
+            log.info(
+                "🎯 Arbitrage found: {}... | YES: {:.3f} NO: {:.3f} | Spread: {:.2%}",
+                lambda: market.question[:50], lambda: market.yes_price,
+                lambda: market.no_price, lambda: market.arbitrage_spread
+            )
         
-        return sorted(opportunities, key=lambda m: m.arbitrage_spread, reverse=True)
+        return opportunities
@@ -4,13 +4,14 @@ Paper Trading Executor - Simulates trades without real execution.
 Use this to test strategies before going live.
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Callable
 from datetime import datetime
 from dataclasses import dataclass, field
-import uuid
+import itertools
+import numpy as np
 from loguru import logger
 
-from src.core.types import Order, Trade, Position, Signal, Side, Outcome, OrderStatus
+from src.core.types import Order, Trade, Position, PairedArbSignal, Side, Outcome, OrderStatus
 
 
 @dataclass
@@ -18,14 +19,68 @@ class PaperAccount:
     """Simulated trading account."""
     balance: float  # USDC balance
     initial_balance: float
-    positions: Dict[str, Position] = field(default_factory=dict)  # token_id -> Position
     trades: List[Trade] = field(default_factory=list)
     
+    # Open positions stored densely by row, with token_id interned to a row
+    # index. shares/current_price columns mirror each row for vectorized
+    # valuation. Removal swaps the last row into the freed slot.
+    _positions: List[Position] = field(init=False, repr=False, default_factory=list)
+    _shares: np.ndarray = field(init=False, repr=False, default_factory=lambda: np.zeros(16))
+    _current_price: np.ndarray = field(init=False, repr=False, default_factory=lambda: np.zeros(16))
+    _token_idx: Dict[str, int] = field(init=False, repr=False, default_factory=dict)
+    
+    @property
+    def positions(self) -> Dict[str, Position]:
+        """Open positions by token_id (a snapshot, not a live mapping)."""
+        return {p.token_id: p for p in self._positions}
+    
+    @property
+    def positions_value(self) -> float:
+        """Current value of all open positions."""
+        n = len(self._positions)
+        return float(np.dot(self._shares[:n], self._current_price[:n]))
+    
     @property
     def total_value(self) -> float:
         """Total account value (balance + positions)."""
-        position_value = sum(p.current_value for p in self.positions.values())
-        return self.balance + position_value
+        return self.balance + self.positions_value
+    
+    def get_position(self, token_id: str) -> Optional[Position]:
+        """Open position for a token, if any."""
+        idx = self._token_idx.get(token_id)
+        return None if idx is None else self._positions[idx]
+    
+    def sync_position(self, position: Position):
+        """Store a new or updated position and mirror it into the columns."""
+        token_id = position.token_id
+        
+        idx = self._token_idx.get(token_id)
+        if idx is None:
+            idx = len(self._positions)
+            if idx == len(self._shares):
+                self._shares = np.resize(self._shares, 2 * idx)
+                self._current_price = np.resize(self._current_price, 2 * idx)
+            self._token_idx[token_id] = idx
+            self._positions.append(position)
+        else:
+            self._positions[idx] = position
+        
+        self._shares[idx] = position.shares
+        self._current_price[idx] = position.current_price
+    
+    def drop_position(self, token_id: str):
+        """Remove a position and its row."""
+        idx = self._token_idx.pop(token_id, None)
+        if idx is None:
+            return
+        
+        last = len(self._positions) - 1
+        moved = self._positions.pop()
+        if idx != last:
+            self._positions[idx] = moved
+            self._shares[idx] = self._shares[last]
+            self._current_price[idx] = self._current_price[last]
+            self._token_idx[moved.token_id] = idx
     
     @property
     def pnl(self) -> float:
@@ -50,18 +105,32 @@ class PaperExecutor:
     - No real money at risk
     """
     
-    def __init__(self, initial_balance: float = 1000.0):
+    def __init__(
+        self,
+        initial_balance: float = 1000.0,
+        clock: Callable[[], datetime] = datetime.utcnow
+    ):
         """
         Initialize paper executor.
         
         Args:
             initial_balance: Starting balance in USD
+            clock: Source of execution timestamps (replays can pass a simulated clock)
         """
+        self._clock = clock
         self.account = PaperAccount(
             balance=initial_balance,
             initial_balance=initial_balance
         )
         self._order_history: List[Order] = []
+        
+        # Sequential IDs: unique within the process, no urandom per order
+        self._order_seq = itertools.count(1)
+        self._trade_seq = itertools.count(1)
+    
+    def now(self) -> datetime:
+        """Current time on this executor's clock (order expirations use it)."""
+        return self._clock()
     
     async def execute_order(self, order: Order) -> Order:
         """
@@ -73,7 +142,7 @@ class PaperExecutor:
         Returns:
             Order with updated status
         """
-        order.order_id = str(uuid.uuid4())[:8]
+        order.order_id = f"o{next(self._order_seq):08x}"
         
         # Calculate cost
         cost = order.price * order.size
@@ -93,7 +162,7 @@ class PaperExecutor:
             
         else:  # SELL
             # Check position
-            position = self.account.positions.get(order.token_id)
+            position = self.account.get_position(order.token_id)
             if not position or position.shares < order.size:
                 order.status = OrderStatus.FAILED
                 logger.warning(f"❌ Insufficient position for sell order")
@@ -109,11 +178,12 @@ class PaperExecutor:
         order.status = OrderStatus.FILLED
         order.filled_size = order.size
         order.filled_price = order.price
-        order.executed_at = datetime.utcnow()
+        now = self._clock()
+        order.executed_at = now
         
         # Record trade
         trade = Trade(
-            id=str(uuid.uuid4())[:8],
+            id=f"t{next(self._trade_seq):08x}",
             market_id=order.market_id,
             token_id=order.token_id,
             side=order.side,
@@ -121,7 +191,7 @@ class PaperExecutor:
             price=order.price,
             size=order.size,
             cost=cost,
-            executed_at=datetime.utcnow(),
+            executed_at=now,
             module="paper"
         )
         self.account.trades.append(trade)
@@ -129,8 +199,8 @@ class PaperExecutor:
         
         action = "BOUGHT" if order.side == Side.BUY else "SOLD"
         logger.info(
-            f"📝 Paper Trade: {action} {order.size:.2f} {order.outcome.value} @ ${order.price:.4f} "
-            f"(Cost: ${cost:.2f})"
+            "📝 Paper Trade: {} {:.2f} {} @ ${:.4f} (Cost: ${:.2f})",
+            action, order.size, order.outcome, order.price, cost
         )
         
         return order
@@ -143,8 +213,22 @@ class PaperExecutor:
         """
         Execute arbitrage pair (buy YES and NO together).
         
-        Both orders must succeed or neither executes.
+        Both orders must succeed or neither executes. The legs share one
+        expiration (the earlier of the two, if both are stamped); a pair
+        executed after it fails as a whole rather than leaving one leg open.
         """
+        expiration = min(
+            (o.expiration for o in (yes_order, no_order) if o.expiration is not None),
+            default=None
+        )
+        yes_order.expiration = no_order.expiration = expiration
+        
+        if expiration is not None and self._clock() > expiration:
+            yes_order.status = OrderStatus.FAILED
+            no_order.status = OrderStatus.FAILED
+            logger.warning(f"❌ Arbitrage pair expired at {expiration:%H:%M:%S.%f}")
+            return yes_order, no_order
+        
         total_cost = (yes_order.price * yes_order.size) + (no_order.price * no_order.size)
         
         if total_cost > self.account.balance:
@@ -153,25 +237,97 @@ class PaperExecutor:
             logger.warning(f"❌ Insufficient balance for arbitrage: ${total_cost:.2f}")
             return yes_order, no_order
         
-        # Execute both
-        yes_result = await self.execute_order(yes_order)
-        no_result = await self.execute_order(no_order)
+        self._execute_pair_fast(yes_order, no_order, total_cost)
         
-        if yes_result.is_filled and no_result.is_filled:
-            profit = (yes_result.size + no_result.size) - total_cost
-            logger.info(
-                f"✅ Arbitrage executed! Total cost: ${total_cost:.4f} | "
-                f"Guaranteed payout: $1.00/share | Profit: ${profit:.4f}"
-            )
+        # One side always resolves to $1.00, so payout is the matched share count
+        profit = min(yes_order.size, no_order.size) - total_cost
+        logger.info(
+            "✅ Arbitrage executed! Total cost: ${:.4f} | "
+            "Guaranteed payout: $1.00/share | Profit: ${:.4f}",
+            total_cost, profit
+        )
+        
+        return yes_order, no_order
+    
+    async def execute_signal(
+        self,
+        signal: PairedArbSignal,
+        expiration: Optional[datetime] = None
+    ) -> tuple[Order, Order]:
+        """
+        Execute a paired arbitrage signal as one YES/NO order pair.
+        
+        Args:
+            signal: Signal from ArbitrageDetector.generate_signals()
+            expiration: Shared expiration for both legs (None for no limit)
+        """
+        yes_order = Order(
+            market_id=signal.market_id,
+            token_id=signal.yes_token_id,
+            side=Side.BUY,
+            outcome=Outcome.YES,
+            price=signal.yes_price,
+            size=signal.shares,
+            expiration=expiration
+        )
+        no_order = Order(
+            market_id=signal.market_id,
+            token_id=signal.no_token_id,
+            side=Side.BUY,
+            outcome=Outcome.NO,
+            price=signal.no_price,
+            size=signal.shares,
+            expiration=expiration
+        )
+        return await self.execute_arbitrage_pair(yes_order, no_order)
+    
+    def _execute_pair_fast(self, yes_order: Order, no_order: Order, total_cost: float):
+        """
+        Fill both legs of a pre-checked arbitrage pair in one update.
+        
+        The caller has already verified the combined balance, so this
+        debits once, stamps both legs with the same time and records
+        two trades linked through paired_trade_id.
+        """
+        now = self._clock()
+        self.account.balance -= total_cost
+        
+        yes_trade_id = f"t{next(self._trade_seq):08x}"
+        no_trade_id = f"t{next(self._trade_seq):08x}"
         
-        return yes_result, no_result
+        for order, trade_id, paired_id in (
+            (yes_order, yes_trade_id, no_trade_id),
+            (no_order, no_trade_id, yes_trade_id),
+        ):
+            order.order_id = f"o{next(self._order_seq):08x}"
+            self._add_to_position(order)
+            
+            order.status = OrderStatus.FILLED
+            order.filled_size = order.size
+            order.filled_price = order.price
+            order.executed_at = now
+            
+            self.account.trades.append(Trade(
+                id=trade_id,
+                market_id=order.market_id,
+                token_id=order.token_id,
+                side=order.side,
+                outcome=order.outcome,
+                price=order.price,
+                size=order.size,
+                cost=order.price * order.size,
+                executed_at=now,
+                module="paper",
+                paired_trade_id=paired_id
+            ))
+            self._order_history.append(order)
     
     def _add_to_position(self, order: Order):
         """Add shares to position."""
         token_id = order.token_id
         
-        if token_id in self.account.positions:
-            pos = self.account.positions[token_id]
+        pos = self.account.get_position(token_id)
+        if pos is not None:
             # Update average price
             total_cost = (pos.shares * pos.avg_price) + (order.size * order.price)
             total_shares = pos.shares + order.size
@@ -179,7 +335,7 @@ class PaperExecutor:
             pos.shares = total_shares
             pos.current_price = order.price
         else:
-            self.account.positions[token_id] = Position(
+            pos = Position(
                 market_id=order.market_id,
                 token_id=token_id,
                 outcome=order.outcome,
@@ -187,18 +343,22 @@ class PaperExecutor:
                 avg_price=order.price,
                 current_price=order.price
             )
+        
+        self.account.sync_position(pos)
     
     def _remove_from_position(self, order: Order):
         """Remove shares from position."""
         token_id = order.token_id
         
-        if token_id in self.account.positions:
-            pos = self.account.positions[token_id]
+        pos = self.account.get_position(token_id)
+        if pos is not None:
             pos.shares -= order.size
             pos.current_price = order.price
             
             if pos.shares <= 0:
-                del self.account.positions[token_id]
+                self.account.drop_position(token_id)
+            else:
+                self.account.sync_position(pos)
     
     def get_status(self) -> str:
         """Get formatted account status."""
@@ -208,7 +368,7 @@ class PaperExecutor:
             f"║ 📊 PAPER TRADING ACCOUNT                                  ║\n"
             f"╠═══════════════════════════════════════════════════════════╣\n"
             f"║ Balance:       ${self.account.balance:>12,.2f}                       ║\n"
-            f"║ Positions:     ${sum(p.current_value for p in self.account.positions.values()):>12,.2f}                       ║\n"
+            f"║ Positions:     ${self.account.positions_value:>12,.2f}                       ║\n"
             f"║ Total Value:   ${self.account.total_value:>12,.2f}                       ║\n"
             f"╠═══════════════════════════════════════════════════════════╣\n"
             f"║ P&L:           ${self.account.pnl:>+12,.2f} ({self.account.pnl_pct:>+.2%})              ║\n"
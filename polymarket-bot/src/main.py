@@ -11,14 +11,14 @@ Usage:
 import asyncio
 import argparse
 import sys
-from datetime import datetime
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
 
 from loguru import logger
 
 from src.core.config import settings
-from src.core.types import Order, Side, Outcome
-from src.data.polymarket import PolymarketClient, MarketScanner
+from src.data.polymarket import PolymarketClient, MarketScanner, PriceFeed
 from src.modules.arbitrage import ArbitrageDetector, format_opportunity
 from src.execution.paper import PaperExecutor
 
@@ -32,11 +32,30 @@ logger.add(
 )
 
 
+# Startup banner, encoded once at import
+_BANNER_BYTES = """
+╔═══════════════════════════════════════════════════════════════════════════════╗
+║                                                                               ║
+║   ██████╗  ██████╗ ██╗  ██╗   ██╗███╗   ███╗ █████╗ ██████╗ ██╗  ██╗███████╗████████╗   ║
+║   ██╔══██╗██╔═══██╗██║  ╚██╗ ██╔╝████╗ ████║██╔══██╗██╔══██╗██║ ██╔╝██╔════╝╚══██╔══╝   ║
+║   ██████╔╝██║   ██║██║   ╚████╔╝ ██╔████╔██║███████║██████╔╝█████╔╝ █████╗     ██║      ║
+║   ██╔═══╝ ██║   ██║██║    ╚██╔╝  ██║╚██╔╝██║██╔══██║██╔══██╗██╔═██╗ ██╔══╝     ██║      ║
+║   ██║     ╚██████╔╝███████╗██║   ██║ ╚═╝ ██║██║  ██║██║  ██║██║  ██╗███████╗   ██║      ║
+║   ╚═╝      ╚═════╝ ╚══════╝╚═╝   ╚═╝     ╚═╝╚═╝  ╚═╝╚═╝  ╚═╝╚═╝  ╚═╝╚══════╝   ╚═╝      ║
+║                                                                               ║
+║                    ⚡ ARBITRAGE BOT v0.1.0 ⚡                                  ║
+║                                                                               ║
+╚═══════════════════════════════════════════════════════════════════════════════╝
+""".encode("utf-8")
+
+
 class TradingEngine:
     """
     Main trading engine orchestrating all components.
     """
     
+    PAIR_TTL = 5  # Seconds an arbitrage pair's orders stay fillable
+    
     def __init__(self, paper_trade: bool = True):
         """
         Initialize trading engine.
@@ -48,8 +67,17 @@ class TradingEngine:
         
         # Initialize components
         self.client = PolymarketClient()
-        self.scanner = MarketScanner(self.client)
+        self.feed = PriceFeed()
+        self.scanner = MarketScanner(
+            self.client, feed=self.feed, price_side=settings.price_side
+        )
         self.arb_detector = ArbitrageDetector()
+        self.arb_detector.warm_up()
+        self.scanner.add_listener(self._on_price_update)
+        
+        # Detection runs here so it doesn't block the event loop (the
+        # Numba kernel releases the GIL); one worker keeps it serialized
+        self._cpu_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="detect")
         
         # Executor
         if paper_trade:
@@ -62,6 +90,17 @@ class TradingEngine:
         self._running = False
         self._scan_count = 0
         self._opportunities_found = 0
+        
+        # market.id -> (yes, no) last acted on, by a scan or a price update,
+        # so the same opportunity at the same prices isn't traded twice
+        self._acted: Dict[str, Tuple[float, float]] = {}
+        
+        # Live detection: the feed writes the scanner's price book and sets
+        # _book_updated; _sweep_book() then checks the rows that changed.
+        # Full scans and sweeps take _detect_lock so they never interleave.
+        self._book_updated = asyncio.Event()
+        self._detect_lock = asyncio.Lock()
+        self._sweeper: Optional[asyncio.Task] = None
     
     async def scan_once(self) -> int:
         """
@@ -73,58 +112,137 @@ class TradingEngine:
         self._scan_count += 1
         logger.info(f"🔍 Scan #{self._scan_count} starting...")
         
-        # Fetch all active markets
-        markets = await self.scanner.scan_all_markets(
-            min_volume=settings.min_market_volume,
-            fetch_prices=True
-        )
+        # Stream markets into detection batch by batch, so detection
+        # overlaps with the price requests still in flight
+        async with self._detect_lock:
+            # Every scan re-checks prices over REST: it is either the
+            # polling fallback or the drift check on the live feed, and
+            # must not just read back the feed's own cache
+            batches = self.scanner.iter_market_batches(
+                min_volume=settings.min_market_volume,
+                fetch_prices=True,
+                use_feed=False
+            )
+            opportunities = [
+                opp async for opp in self.arb_detector.detect_stream(
+                    batches, top_k=5, executor=self._cpu_pool
+                )
+            ]
+            found = self.arb_detector.last_match_count
         
-        if not markets:
+        # Pairs from this scan stay fillable for PAIR_TTL from here, however
+        # long the display and the executions ahead of them take
+        expiration = self._pair_expiration()
+        
+        # Ticks that arrived mid-scan carry over into the reloaded book as
+        # dirty rows; make sure the live sweep picks them up
+        self._book_updated.set()
+        
+        if not self.scanner.markets:
             logger.warning("No markets found")
             return 0
         
-        # Detect arbitrage opportunities
-        opportunities = self.arb_detector.detect(markets)
+        # Only the overall top 5 are acted on
+        opportunities.sort(key=lambda o: o.profit_pct, reverse=True)
+        opportunities = opportunities[:5]
         
         if opportunities:
-            self._opportunities_found += len(opportunities)
-            logger.info(f"🎯 Found {len(opportunities)} arbitrage opportunities!")
+            self._opportunities_found += found
+            logger.info(f"🎯 Found {found} arbitrage opportunities!")
             
-            for opp in opportunities[:5]:  # Show top 5
-                print(format_opportunity(opp))
+            for opp in opportunities:
+                # Blocking stdout write off the loop, so feed pings and
+                # fetches keep running
+                await asyncio.to_thread(print, format_opportunity(opp))
                 
-                # Execute if paper trading
-                if self.paper_trade:
-                    await self._execute_arbitrage(opp)
+                # Execute if paper trading (once per market at given prices)
+                if self.paper_trade and self._mark_acted(opp):
+                    await self._execute_arbitrage(opp, expiration)
         else:
             logger.info("No arbitrage opportunities found this scan")
         
-        return len(opportunities)
+        return found
     
-    async def _execute_arbitrage(self, opp):
-        """Execute arbitrage opportunity."""
-        # Calculate shares to buy
-        shares_per_side = opp.suggested_size / opp.total_cost
-        
-        yes_order = Order(
-            market_id=opp.market.id,
-            token_id=opp.market.yes_token_id,
-            side=Side.BUY,
-            outcome=Outcome.YES,
-            price=opp.yes_price,
-            size=shares_per_side
-        )
+    def _on_price_update(self, market):
+        """Wake the live sweep; the feed has already written the price book."""
+        self._book_updated.set()
+    
+    async def _sweep_book(self):
+        """
+        Detect on price-book rows the feed has changed, as updates arrive.
         
-        no_order = Order(
-            market_id=opp.market.id,
-            token_id=opp.market.no_token_id,
-            side=Side.BUY,
-            outcome=Outcome.NO,
-            price=opp.no_price,
-            size=shares_per_side
-        )
+        Ticks landing while a sweep runs are picked up together by the
+        next one, so bursts cost one vectorized pass rather than one
+        check per tick.
+        """
+        while self._running:
+            await self._book_updated.wait()
+            self._book_updated.clear()
+            
+            # Keep the sweep alive through any one failed pass; nothing
+            # else would restart it before shutdown
+            try:
+                await self._sweep_once()
+            except Exception as e:
+                logger.error(f"Live sweep failed: {e}")
+    
+    async def _sweep_once(self):
+        """Run detection on the current dirty rows and act on new hits."""
+        book = self.scanner.book
+        loop = asyncio.get_running_loop()
+        
+        async with self._detect_lock:
+            rows = book.take_dirty()
+            if rows.size == 0:
+                return
+            snapshot = book.snapshot(rows)
+            expiration = self._pair_expiration()  # Prices are as of the snapshot
+            opportunities = await loop.run_in_executor(
+                self._cpu_pool, self.arb_detector.detect_arrays, *snapshot
+            )
         
-        await self.executor.execute_arbitrage_pair(yes_order, no_order)
+        hits = {opp.market.id for opp in opportunities}
+        for market in snapshot[0]:
+            if market.id not in hits:
+                self._acted.pop(market.id, None)
+        
+        for opp in opportunities:
+            if not self._mark_acted(opp):
+                continue
+            
+            self._opportunities_found += 1
+            logger.info(f"⚡ Live arbitrage: {opp.market.question[:50]} ({opp.profit_pct:.2%})")
+            
+            if self.paper_trade:
+                try:
+                    await self._execute_arbitrage(opp, expiration)
+                except Exception as e:
+                    logger.error(f"Live execution failed for {opp.market.id}: {e}")
+    
+    def _mark_acted(self, opp) -> bool:
+        """Record opp as acted on; False if it already was at these prices."""
+        key = (opp.yes_price, opp.no_price)
+        if self._acted.get(opp.market.id) == key:
+            return False
+        self._acted[opp.market.id] = key
+        return True
+    
+    def _pair_expiration(self) -> Optional[datetime]:
+        """Expiration for pairs detected now, on the executor's clock."""
+        if not self.paper_trade:
+            return None
+        return self.executor.now() + timedelta(seconds=self.PAIR_TTL)
+    
+    async def _execute_arbitrage(self, opp, expiration: Optional[datetime] = None):
+        """
+        Execute arbitrage opportunity.
+        
+        Both legs share `expiration`, stamped when the opportunity was
+        detected, so they fill together or not at all and a pair that
+        waited too long behind others fails instead of filling late.
+        """
+        signal, = self.arb_detector.generate_signals([opp])
+        await self.executor.execute_signal(signal, expiration=expiration)
     
     async def run(self, single_scan: bool = False):
         """
@@ -135,32 +253,24 @@ class TradingEngine:
         """
         self._running = True
         
-        print("""
-╔═══════════════════════════════════════════════════════════════════════════════╗
-║                                                                               ║
-║   ██████╗  ██████╗ ██╗  ██╗   ██╗███╗   ███╗ █████╗ ██████╗ ██╗  ██╗███████╗████████╗   ║
-║   ██╔══██╗██╔═══██╗██║  ╚██╗ ██╔╝████╗ ████║██╔══██╗██╔══██╗██║ ██╔╝██╔════╝╚══██╔══╝   ║
-║   ██████╔╝██║   ██║██║   ╚████╔╝ ██╔████╔██║███████║██████╔╝█████╔╝ █████╗     ██║      ║
-║   ██╔═══╝ ██║   ██║██║    ╚██╔╝  ██║╚██╔╝██║██╔══██║██╔══██╗██╔═██╗ ██╔══╝     ██║      ║
-║   ██║     ╚██████╔╝███████╗██║   ██║ ╚═╝ ██║██║  ██║██║  ██║██║  ██╗███████╗   ██║      ║
-║   ╚═╝      ╚═════╝ ╚══════╝╚═╝   ╚═╝     ╚═╝╚═╝  ╚═╝╚═╝  ╚═╝╚═╝  ╚═╝╚══════╝   ╚═╝      ║
-║                                                                               ║
-║                    ⚡ ARBITRAGE BOT v0.1.0 ⚡                                  ║
-║                                                                               ║
-╚═══════════════════════════════════════════════════════════════════════════════╝
-        """)
+        # Banner only for interactive runs; skipped under log capture/cron
+        if sys.stdout.isatty():
+            sys.stdout.flush()
+            sys.stdout.buffer.write(_BANNER_BYTES)
+            sys.stdout.buffer.flush()
         
         logger.info(f"Mode: {'PAPER TRADING' if self.paper_trade else 'LIVE TRADING'}")
         logger.info(f"Bankroll: ${settings.bankroll:,.2f}")
         logger.info(f"Min arbitrage spread: {settings.min_arbitrage_spread:.1%}")
         logger.info(f"Min market volume: ${settings.min_market_volume:,.0f}")
-        logger.info(f"Scan interval: {settings.scan_interval}s")
+        logger.info(f"Scan interval: {settings.scan_interval}s (live feed: {settings.rescan_interval}s)")
         print()
         
         try:
             if single_scan:
                 await self.scan_once()
             else:
+                self._sweeper = asyncio.create_task(self._sweep_book())
                 while self._running:
                     await self.scan_once()
                     
@@ -168,8 +278,20 @@ class TradingEngine:
                     if self.paper_trade:
                         print(self.executor.get_status())
                     
-                    logger.info(f"💤 Sleeping {settings.scan_interval}s until next scan...")
-                    await asyncio.sleep(settings.scan_interval)
+                    # While the feed is live, price updates drive detection and
+                    # full rescans only reconcile drift; otherwise poll. Wake
+                    # every scan_interval so a dropped feed falls back promptly
+                    if self.feed.connected:
+                        interval = settings.rescan_interval
+                    else:
+                        interval = settings.scan_interval
+                    logger.info(f"💤 Sleeping {interval}s until next scan...")
+                    waited = 0
+                    while waited < interval:
+                        await asyncio.sleep(settings.scan_interval)
+                        waited += settings.scan_interval
+                        if not self.feed.connected:
+                            break
                     
         except KeyboardInterrupt:
             logger.info("🛑 Shutting down...")
@@ -179,7 +301,11 @@ class TradingEngine:
     async def shutdown(self):
         """Clean shutdown."""
         self._running = False
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+        await self.feed.close()
         await self.client.close()
+        self._cpu_pool.shutdown(wait=False)
         
         # Final summary
         print("\n" + "="*60)
@@ -4,16 +4,51 @@ Arbitrage Module - Detects and executes single-market arbitrage.
 Strategy: When YES_price + NO_price < 1.0, buy both sides for guaranteed profit.
 """
 
-from typing import List, Optional
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import Executor
+from typing import AsyncIterable, AsyncIterator, List, Optional, Tuple
 from datetime import datetime
+import numpy as np
 from loguru import logger
 
 from src.core.config import settings
 from src.core.types import (
-    Market, Signal, ArbitrageOpportunity, 
-    Side, Outcome, SignalUrgency
+    Market, ArbitrageOpportunity, PairedArbSignal
 )
 
+try:
+    from numba import njit, prange
+except ImportError:  # Numba is optional; fall back to plain NumPy
+    njit = None
+
+
+def _detect_numpy(yp, np_, vol, min_vol, min_spr):
+    """Vectorized arbitrage test. Returns (total_cost, profit_pct, mask)."""
+    total = yp + np_
+    pct = (1.0 - total) / np.maximum(total, 1e-12)
+    mask = (yp > 0) & (np_ > 0) & (vol >= min_vol) & (pct >= min_spr)
+    return total, pct, mask
+
+
+if njit is not None:
+    @njit(parallel=True, nogil=True, cache=True)
+    def _detect_kernel(yp, np_, vol, min_vol, min_spr):
+        """Same as _detect_numpy, fused into one parallel pass."""
+        n = yp.shape[0]
+        total = np.empty(n)
+        pct = np.empty(n)
+        mask = np.empty(n, dtype=np.bool_)
+        for i in prange(n):
+            t = yp[i] + np_[i]
+            p = (1.0 - t) / max(t, 1e-12)
+            total[i] = t
+            pct[i] = p
+            mask[i] = yp[i] > 0 and np_[i] > 0 and vol[i] >= min_vol and p >= min_spr
+        return total, pct, mask
+else:
+    _detect_kernel = _detect_numpy
+
 
 class ArbitrageDetector:
     """
@@ -28,6 +63,11 @@ class ArbitrageDetector:
         Buy both for $0.97, one pays $1.00 = $0.03 profit (3.1%)
     """
     
+    # Column kernel: Numba-compiled when available, NumPy otherwise
+    _kernel = staticmethod(_detect_kernel)
+    
+    CACHE_SIZE = 50_000  # Max remembered opportunities
+    
     def __init__(
         self,
         min_spread: float = None,
@@ -45,138 +85,235 @@ class ArbitrageDetector:
         self.min_spread = min_spread or settings.min_arbitrage_spread
         self.min_volume = min_volume or settings.min_market_volume
         self.max_position = max_position or settings.max_position_usd
+        
+        # Column buffers (yes, no, volume, liquidity) reused by detect()
+        self._columns = np.empty((4, 0))
+        self.last_match_count = 0
+        
+        # market.id -> ((yes, no, volume, liquidity), opportunity) for recent
+        # matches, so unchanged opportunities aren't rebuilt every scan
+        self._last: OrderedDict[str, Tuple[tuple, ArbitrageOpportunity]] = OrderedDict()
+    
+    def warm_up(self):
+        """
+        Run the detection kernel once so JIT compilation happens up front.
+        
+        Call from the main thread before handing detect() to a worker, so
+        Numba's threading layer is initialized there.
+        """
+        one = np.ones(1)
+        self._kernel(one, one, one, self.min_volume, self.min_spread)
     
-    def detect(self, markets: List[Market]) -> List[ArbitrageOpportunity]:
+    def detect(
+        self,
+        markets: List[Market],
+        top_k: Optional[int] = None
+    ) -> List[ArbitrageOpportunity]:
         """
         Scan markets for arbitrage opportunities.
         
+        Prices, volume and liquidity are copied into column arrays and
+        checked in one vectorized pass; ArbitrageOpportunity objects are
+        only built for the markets that pass, and reused from an earlier
+        scan if that market's inputs haven't changed (so timestamp is
+        when the opportunity was first seen). The total number of
+        matches (before top_k) is kept in last_match_count.
+        
         Args:
             markets: List of markets to scan
+            top_k: Only return the best top_k opportunities (None for all)
             
         Returns:
             List of ArbitrageOpportunity objects, sorted by profit %
         """
-        opportunities = []
+        self.last_match_count = 0
+        n = len(markets)
+        if n == 0:
+            return []
+        
+        # Reuse column buffers across scans; grow only when the universe does
+        if self._columns.shape[1] < n:
+            self._columns = np.empty((4, max(n, 2 * self._columns.shape[1])))
+        yp, np_, vol, liq = self._columns[:, :n]
+        for i, m in enumerate(markets):
+            yp[i] = m.yes_price
+            np_[i] = m.no_price
+            vol[i] = m.volume_24h
+            liq[i] = m.liquidity
         
-        for market in markets:
-            opp = self._check_market(market)
-            if opp:
-                opportunities.append(opp)
+        return self.detect_arrays(markets, yp, np_, vol, liq, top_k)
+    
+    def detect_arrays(
+        self,
+        markets: List[Market],
+        yp: np.ndarray,
+        np_: np.ndarray,
+        vol: np.ndarray,
+        liq: np.ndarray,
+        top_k: Optional[int] = None
+    ) -> List[ArbitrageOpportunity]:
+        """
+        Same as detect(), on columns that are already laid out.
+        
+        Row i of yes/no/volume/liquidity belongs to markets[i], e.g. a
+        PriceBook.snapshot(), so no Market fields are read to detect.
+        """
+        self.last_match_count = 0
+        if len(markets) == 0:
+            return []
+        
+        total, pct, mask = self._kernel(yp, np_, vol, self.min_volume, self.min_spread)
+        idx = np.nonzero(mask)[0]
+        self.last_match_count = int(idx.size)
+        if idx.size == 0:
+            return []
+        
+        # Select the top_k before sorting: O(N + K log K)
+        if top_k is not None and idx.size > top_k:
+            idx = np.sort(idx[np.argpartition(-pct[idx], top_k - 1)[:top_k]])
         
         # Sort by profit percentage (highest first)
-        opportunities.sort(key=lambda x: x.profit_pct, reverse=True)
+        idx = idx[np.argsort(-pct[idx], kind="stable")]
+        
+        # Matches all have total_cost > 0
+        max_shares = self.max_position / total[idx]
+        liquidity_limit = np.where(liq[idx] > 0, liq[idx] / 2, np.inf)
+        suggested_shares = np.minimum(max_shares, liquidity_limit)
+        
+        opportunities = []
+        last = self._last
+        now = datetime.utcnow()  # One timestamp for everything found this scan
+        for j, i in enumerate(idx.tolist()):
+            market = markets[i]
+            yes_price, no_price = float(yp[i]), float(np_[i])
+            key = (yes_price, no_price, float(vol[i]), float(liq[i]))
+            cached = last.get(market.id)
+            if cached is not None and cached[0] == key and cached[1].market is market:
+                last.move_to_end(market.id)
+                opportunities.append(cached[1])
+                continue
+            
+            t = float(total[i])
+            opp = ArbitrageOpportunity(
+                market=market,
+                yes_price=yes_price,
+                no_price=no_price,
+                total_cost=t,
+                profit=1.0 - t,
+                profit_pct=float(pct[i]),
+                max_size=float(max_shares[j]) * t,
+                suggested_size=float(suggested_shares[j]) * t,
+                timestamp=now
+            )
+            last[market.id] = (key, opp)
+            last.move_to_end(market.id)
+            opportunities.append(opp)
+        
+        while len(last) > self.CACHE_SIZE:
+            last.popitem(last=False)
         
         return opportunities
     
-    def _check_market(self, market: Market) -> Optional[ArbitrageOpportunity]:
-        """Check a single market for arbitrage."""
-        
-        # Skip if prices are invalid
-        if market.yes_price <= 0 or market.no_price <= 0:
-            return None
-        
-        # Skip if below volume threshold
-        if market.volume_24h < self.min_volume:
-            return None
-        
-        # Calculate total cost and profit
-        total_cost = market.yes_price + market.no_price
-        profit = 1.0 - total_cost
-        profit_pct = profit / total_cost if total_cost > 0 else 0
-        
-        # Skip if spread is below threshold
-        if profit_pct < self.min_spread:
-            return None
-        
-        # Calculate sizing
-        # Max shares = max_position / total_cost_per_share
-        max_shares = self.max_position / total_cost if total_cost > 0 else 0
-        
-        # Also consider liquidity (use lower of the two)
-        liquidity_limit = market.liquidity / 2 if market.liquidity > 0 else float('inf')
-        suggested_shares = min(max_shares, liquidity_limit)
-        
-        return ArbitrageOpportunity(
-            market=market,
-            yes_price=market.yes_price,
-            no_price=market.no_price,
-            total_cost=total_cost,
-            profit=profit,
-            profit_pct=profit_pct,
-            max_size=max_shares * total_cost,
-            suggested_size=suggested_shares * total_cost,
-            timestamp=datetime.utcnow()
-        )
+    async def detect_stream(
+        self,
+        batches: AsyncIterable[List[Market]],
+        top_k: Optional[int] = None,
+        executor: Optional[Executor] = None
+    ) -> AsyncIterator[ArbitrageOpportunity]:
+        """
+        Run detect() on each batch of markets as it arrives.
+        
+        Lets detection overlap with fetching the remaining batches (see
+        MarketScanner.iter_market_batches). Opportunities are yielded per
+        batch, best first within a batch; top_k applies per batch. Once
+        exhausted, last_match_count is the total over all batches.
+        
+        If executor is given, detect() runs there instead of on the event
+        loop. It should be single-threaded (detect() reuses buffers).
+        """
+        loop = asyncio.get_running_loop()
+        found = 0
+        async for batch in batches:
+            if executor is None:
+                opportunities, count = self._detect_counted(batch, top_k)
+            else:
+                opportunities, count = await loop.run_in_executor(
+                    executor, self._detect_counted, batch, top_k
+                )
+            found += count
+            self.last_match_count = found
+            for opp in opportunities:
+                yield opp
+    
+    def _detect_counted(
+        self,
+        markets: List[Market],
+        top_k: Optional[int]
+    ) -> Tuple[List[ArbitrageOpportunity], int]:
+        """detect() plus its match count, read in the same thread."""
+        opportunities = self.detect(markets, top_k)
+        return opportunities, self.last_match_count
     
     def generate_signals(
         self, 
         opportunities: List[ArbitrageOpportunity]
-    ) -> List[Signal]:
+    ) -> List[PairedArbSignal]:
         """
         Convert arbitrage opportunities to trading signals.
         
-        Each opportunity generates TWO signals (buy YES and buy NO).
+        Each opportunity generates ONE paired signal covering both legs
+        (buy YES and buy NO), since they must be executed together.
         """
         signals = []
         
         for opp in opportunities:
-            # Signal to buy YES
-            yes_signal = Signal(
+            shares = opp.suggested_size / opp.total_cost
+            signals.append(PairedArbSignal(
                 module="arbitrage",
                 market_id=opp.market.id,
-                token_id=opp.market.yes_token_id,
-                action=Side.BUY,
-                outcome=Outcome.YES,
-                confidence=1.0,  # Arbitrage is mathematically certain
-                expected_value=opp.profit * (opp.suggested_size / opp.total_cost) / 2,
-                size_suggestion=opp.suggested_size / 2,
-                urgency=SignalUrgency.IMMEDIATE,
+                yes_token_id=opp.market.yes_token_id,
+                no_token_id=opp.market.no_token_id,
+                yes_price=opp.yes_price,
+                no_price=opp.no_price,
+                shares=shares,
+                expected_value=opp.profit * shares,
                 metadata={
                     "type": "arbitrage",
-                    "pair_token": opp.market.no_token_id,
                     "total_cost": opp.total_cost,
                     "profit_pct": opp.profit_pct
                 }
-            )
-            
-            # Signal to buy NO
-            no_signal = Signal(
-                module="arbitrage",
-                market_id=opp.market.id,
-                token_id=opp.market.no_token_id,
-                action=Side.BUY,
-                outcome=Outcome.NO,
-                confidence=1.0,
-                expected_value=opp.profit * (opp.suggested_size / opp.total_cost) / 2,
-                size_suggestion=opp.suggested_size / 2,
-                urgency=SignalUrgency.IMMEDIATE,
-                metadata={
-                    "type": "arbitrage",
-                    "pair_token": opp.market.yes_token_id,
-                    "total_cost": opp.total_cost,
-                    "profit_pct": opp.profit_pct
-                }
-            )
-            
-            signals.extend([yes_signal, no_signal])
+            ))
         
         return signals
 
 
+# Display box for format_opportunity(), parsed once at import
+_TMPL = (
+    "╔═══════════════════════════════════════════════════════════╗\n"
+    "║ 🎯 ARBITRAGE OPPORTUNITY                                  ║\n"
+    "╠═══════════════════════════════════════════════════════════╣\n"
+    "║ Market: {question:<50} ║\n"
+    "╠═══════════════════════════════════════════════════════════╣\n"
+    "║ YES Price: ${yes_price:.4f}                                      ║\n"
+    "║ NO Price:  ${no_price:.4f}                                      ║\n"
+    "║ Total:     ${total_cost:.4f}                                      ║\n"
+    "╠═══════════════════════════════════════════════════════════╣\n"
+    "║ 💰 PROFIT: ${profit:.4f} ({profit_pct:.2%})                         ║\n"
+    "║ 📊 Suggested Size: ${suggested_size:.2f}                        ║\n"
+    "║ 📈 24h Volume: ${volume:,.0f}                            ║\n"
+    "╚═══════════════════════════════════════════════════════════╝"
+)
+
+
 def format_opportunity(opp: ArbitrageOpportunity) -> str:
     """Format opportunity for logging/display."""
-    return (
-        f"╔═══════════════════════════════════════════════════════════╗\n"
-        f"║ 🎯 ARBITRAGE OPPORTUNITY                                  ║\n"
-        f"╠═══════════════════════════════════════════════════════════╣\n"
-        f"║ Market: {opp.market.question[:50]:<50} ║\n"
-        f"╠═══════════════════════════════════════════════════════════╣\n"
-        f"║ YES Price: ${opp.yes_price:.4f}                                      ║\n"
-        f"║ NO Price:  ${opp.no_price:.4f}                                      ║\n"
-        f"║ Total:     ${opp.total_cost:.4f}                                      ║\n"
-        f"╠═══════════════════════════════════════════════════════════╣\n"
-        f"║ 💰 PROFIT: ${opp.profit:.4f} ({opp.profit_pct:.2%})                         ║\n"
-        f"║ 📊 Suggested Size: ${opp.suggested_size:.2f}                        ║\n"
-        f"║ 📈 24h Volume: ${opp.market.volume_24h:,.0f}                            ║\n"
-        f"╚═══════════════════════════════════════════════════════════╝"
-    )
+    return _TMPL.format_map({
+        "question": opp.market.question[:50],
+        "yes_price": opp.yes_price,
+        "no_price": opp.no_price,
+        "total_cost": opp.total_cost,
+        "profit": opp.profit,
+        "profit_pct": opp.profit_pct,
+        "suggested_size": opp.suggested_size,
+        "volume": opp.market.volume_24h,
+    })